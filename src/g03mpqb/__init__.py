@@ -12,6 +12,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from g03mpqb import app
+from g03mpqb import app, command, config
 
-__all__ = ["app"]
+__all__ = ["app", "command", "config"]
@@ -14,154 +14,173 @@
 
 """Main application."""
 
-import argparse
-from io import TextIOWrapper
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import json
 import logging
+import os
 import sys
-from typing import Any
+from typing import TYPE_CHECKING, Any, cast
 
-import botpy
-from botpy.message import DirectMessage
+from g03mpqb.command import Commander, LaunchWorker
+from g03mpqb.config import Config
 
-from g03mpqb.command import Command, Commander
+# Kept importable from g03mpqb.app for compatibility.
+from g03mpqb.config import ConfigDict as ConfigDict, ConfigError as ConfigError
 
-if __name__ == "__main__":
-    import os.path
+if TYPE_CHECKING:
+    import botpy
+    from botpy.message import DirectMessage
+
+    class BotClient(botpy.Client):
+        """Bot client, defined at runtime by `_load_bot`."""
+
+        OnMessageListener: type["OnMessageListener"]
+
+        @property
+        def on_message_listener(self) -> "OnMessageListener": ...
 
+        @on_message_listener.setter
+        def on_message_listener(
+            self, on_message_listener: "OnMessageListener"
+        ) -> None: ...
+
+if __name__ == "__main__":
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 
 logger = logging.getLogger(__name__)
 
+_REPLY_OK = "Executed command successfully."
 
-class BotClient(botpy.Client):
-    """Bot client."""
 
-    class OnMessageListener:
-        """Message listener."""
+class OnMessageListener:
+    """Message listener."""
 
-        __slots__ = ()
+    __slots__ = ()
 
-        def on_direct_message_create(self, message: DirectMessage) -> str:
-            """Handle direct messages."""
-            return ""
+    async def on_direct_message_create(self, message: "DirectMessage") -> str:
+        """Handle direct messages."""
+        return ""
 
-    __on_message_listener: OnMessageListener | None
+    async def close(self) -> None:
+        """Release resources when the client closes."""
 
-    @property
-    def on_message_listener(self) -> OnMessageListener:
-        """Get the on-message listener associated with this client."""
-        if self.__on_message_listener is None:
-            raise RuntimeError("Client's on-message listener is not initialized")
-        return self.__on_message_listener
 
-    @on_message_listener.setter
-    def on_message_listener(self, on_message_listener: OnMessageListener) -> None:
-        """Set the on-message listener associated with this client."""
-        self.__on_message_listener = on_message_listener
+@functools.cache
+def _load_bot() -> type["BotClient"]:
+    """Import botpy and define the bot client class.
 
-    async def on_direct_message_create(self, message: DirectMessage) -> None:
-        """Handle direct messages."""
-        logger.info(f"Received direct message from {message.author}: {message.content}")
-        reply_content = self.on_message_listener.on_direct_message_create(message)
-        await message.reply(content=reply_content)
+    botpy pulls in aiohttp and friends, so it is only imported once the
+    config has been loaded and the client is actually needed.
+    """
+    import botpy
 
+    class _BotClient(botpy.Client):
+        """Bot client."""
 
-class ConfigError(KeyError):
-    """Missing entry in config."""
+        OnMessageListener = OnMessageListener
 
-    _missing: str
+        __on_message_listener: OnMessageListener | None = None
 
-    def __init__(self, missing_key: str):
-        self._missing = missing_key
+        @property
+        def on_message_listener(self) -> OnMessageListener:
+            """Get the on-message listener associated with this client."""
+            if self.__on_message_listener is None:
+                raise RuntimeError("Client's on-message listener is not initialized")
+            return self.__on_message_listener
+
+        @on_message_listener.setter
+        def on_message_listener(self, on_message_listener: OnMessageListener) -> None:
+            """Set the on-message listener associated with this client."""
+            self.__on_message_listener = on_message_listener
+
+        async def on_direct_message_create(self, message: "DirectMessage") -> None:
+            """Handle direct messages."""
+            logger.info(
+                "Received direct message from %s: %s", message.author, message.content
+            )
+            reply_content = await self.on_message_listener.on_direct_message_create(
+                message
+            )
+            await message.reply(content=reply_content)
 
-    def __repr__(self) -> str:
-        return f"Missing entry with key {self._missing}"
+        async def close(self) -> None:
+            """Close the on-message listener along with the client."""
+            if not self.is_closed() and self.__on_message_listener is not None:
+                await self.__on_message_listener.close()
+            await super().close()
 
+    _BotClient.__name__ = _BotClient.__qualname__ = "BotClient"
+    return cast("type[BotClient]", _BotClient)
 
-type ConfigDict = dict[str, Any]
 
+def __getattr__(name: str) -> Any:
+    if name == "BotClient":
+        return _load_bot()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-class App:
-    """Main application class."""
 
-    class Config:
-        """Application config."""
+def _install_uvloop() -> None:
+    """Use uvloop as the asyncio event loop if it is installed.
 
-        _conf_dict: dict
+    Must run before the client is created, since botpy grabs its event loop
+    with `asyncio.get_event_loop()` in `botpy.Client.__init__`.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    # uvloop>=0.22 no longer creates a loop in `get_event_loop()`, set one.
+    asyncio.set_event_loop(uvloop.new_event_loop())
+    logger.info("Using uvloop event loop.")
 
-        def __init__(self, config_dict: dict) -> None:
-            self._conf_dict = config_dict
 
-        @property
-        def appid(self) -> str:
-            """Bot app ID."""
-            return self._config_entry()
+class _DMListener(OnMessageListener):
+    """Message listener running commands from direct messages."""
 
-        @property
-        def secret(self) -> str:
-            """Bot app secret."""
-            return self._config_entry()
+    __slots__ = ("_pool", "_launcher")
 
-        @property
-        def commands(self) -> dict[str, Command]:
-            """Commands."""
-            return self._config_entry(required=False, default={})
-
-        def _config_entry(
-            self,
-            key: str | None = None,
-            *,
-            required: bool = True,
-            default: Any = None,
-        ) -> Any:
-            """Require a config entry by key.
-
-            If `key` is omitted, attempt to infer the key from the caller's
-            function name (useful for simple property wrappers like
-            `def appid(self): return self._config_entry()`). If
-            inference fails, raise a ValueError to require the caller to pass
-            the key explicitly.
-            """
-            if key is None:
-                # Import here to keep module imports minimal at top-level.
-                import inspect
-
-                frame = inspect.currentframe()
-                try:
-                    caller_name = None
-                    if frame is not None and frame.f_back is not None:
-                        caller_name = frame.f_back.f_code.co_name
-                    if not caller_name or caller_name == "<module>":
-                        raise ValueError(
-                            "Unable to infer config key from caller; please provide the key explicitly"
-                        )
-                    key = caller_name
-                finally:
-                    # Break reference cycles created by frame objects
-                    del frame
-
-            conf_dict = self._conf_dict
-            return (
-                App.Config.require_config_entry(conf_dict, key)
-                if required
-                else conf_dict.get(key, default)
+    _pool: ThreadPoolExecutor
+    _launcher: LaunchWorker
+
+    def __init__(self, commander: Commander) -> None:
+        # Launching processes blocks, keep it off the event loop.
+        pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="command")
+        self._pool = pool
+        self._launcher = LaunchWorker(commander, pool)
+
+    async def on_direct_message_create(self, message: "DirectMessage") -> str:
+        """Handle direct messages."""
+        # botpy only exposes the decoded content, and `str.strip()`
+        # returns it as-is when there is no whitespace to strip.
+        cmd_name = message.content.strip()
+        resp = await self._launcher.run_command(cmd_name)
+        if resp is None:
+            reply_content = f"No such command: {cmd_name}"
+            logger.info("No such command from %s: %s", message.author, cmd_name)
+        else:
+            reply_content = resp if resp else _REPLY_OK
+            logger.info(
+                "Executed command from %s: %s -> %s",
+                message.author,
+                cmd_name,
+                reply_content,
             )
+        return reply_content
 
-        @classmethod
-        def load_json(cls, fp: TextIOWrapper) -> "App.Config":
-            """Load config from json file."""
-            conf_dict = json.load(fp)
-            return App.Config(conf_dict)
+    async def close(self) -> None:
+        """Stop launching commands."""
+        await self._launcher.close()
+        self._pool.shutdown(wait=False)
+
+
+class App:
+    """Main application class."""
 
-        @staticmethod
-        def require_config_entry(config_dict: ConfigDict, key: str) -> Any:
-            """Get config entry by key."""
-            try:
-                return config_dict[key]
-            except KeyError:
-                raise ConfigError(key)
+    Config = Config
 
     _config: Config
     _commander: Commander
@@ -172,8 +191,7 @@ class App:
         print("Loading config...")
 
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                self._config = config = App.Config.load_json(f)
+            self._config = config = App.Config.load_json(config_path)
         except IOError as err:
             print("Failed to read config file.")
             raise err
@@ -186,39 +204,46 @@ class App:
 
         print("Start client.")
         print("------------------------")
+        import botpy
+
+        BotClient = _load_bot()
+        _install_uvloop()
         intents = botpy.Intents.all()
         client = BotClient(intents=intents)
-
-        class AppOnMessageListener(BotClient.OnMessageListener):
-            """Message listener."""
-
-            def on_direct_message_create(self, message: DirectMessage) -> str:
-                """Handle direct messages."""
-                cmd_name = message.content.strip()
-                resp = commander.run_command_noblock(cmd_name)
-                if resp is None:
-                    reply_content = f"No such command: {cmd_name}"
-                    logger.info(
-                        "No such command from %s: %s", message.author, cmd_name
-                    )
-                else:
-                    reply_content = (
-                        resp if resp else "Executed command successfully."
-                    )
-                    logger.info(
-                        "Executed command from %s: %s -> %s",
-                        message.author,
-                        cmd_name,
-                        reply_content,
-                    )
-                return reply_content
-
-        client.on_message_listener = AppOnMessageListener()
+        client.on_message_listener = _DMListener(commander)
         client.run(appid=config.appid, secret=config.secret)
+        # botpy returns without closing the client when interrupted.
+        if not client.loop.is_closed():
+            client.loop.run_until_complete(client.close())
+
+
+def _scan_config_arg(argv: list[str]) -> tuple[bool, str | None]:
+    """Scan `-c/--config` from argv without argparse.
+
+    Only the plain forms are handled; the first value is `False` if argv
+    holds anything else, e.g. `-h`, so that argparse can deal with it.
+    """
+    config = None
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ("-c", "--config") and i + 1 < len(argv):
+            config = argv[i + 1]
+            if config.startswith("-"):
+                return False, None
+            i += 2
+        elif arg.startswith("--config="):
+            config = arg[len("--config=") :]
+            i += 1
+        else:
+            return False, None
+    return True, config
+
+
+def _parse_config_arg() -> str | None:
+    """Parse `-c/--config` with argparse."""
+    import argparse
 
-
-def main() -> int:
-    """Run the bot application."""
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "-c",
@@ -227,8 +252,15 @@ def main() -> int:
         help="Path to the secret JSON config file.",
     )
     args = parser.parse_args()
+    return args.config
+
+
+def main() -> int:
+    """Run the bot application."""
+    scanned, arg_config = _scan_config_arg(sys.argv[1:])
+    if not scanned:
+        arg_config = _parse_config_arg()
     try:
-        arg_config = args.config
         if arg_config is None:
             print("Config file path required (-c/--config).")
             raise ValueError("Config file path is required")
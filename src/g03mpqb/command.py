@@ -14,52 +14,235 @@
 
 """Commands."""
 
+import asyncio
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+import functools
 import logging
+import os
+import signal
 import subprocess
-from typing import TypedDict, NotRequired
+from typing import TypedDict, NotRequired, Self
 
 logger = logging.getLogger(__name__)
 
 type Executable = list[str]
 
+_HAS_POSIX_SPAWN = hasattr(os, "posix_spawnp")
+# Signals ignored by the interpreter that children should get back to default,
+# as `subprocess.Popen(restore_signals=True)` does.
+_SPAWN_SIGDEF = tuple(
+    getattr(signal, sig) for sig in ("SIGPIPE", "SIGXFSZ") if hasattr(signal, sig)
+)
 
-class Command(TypedDict):
-    """Command details."""
 
-    execute: Executable
+class CommandConfig(TypedDict):
+    """Command details in config."""
+
+    execute: Executable | str
     response: NotRequired[str]
     shell: NotRequired[bool]
 
 
+@dataclass(slots=True, frozen=True)
+class Command:
+    """Command details."""
+
+    execute: tuple[str, ...]
+    shell: bool = False
+    response: str = ""
+    execute_bytes: tuple[bytes, ...] = field(init=False, repr=False, compare=False)
+    """`execute` encoded once for spawning, empty for shell commands."""
+
+    def __post_init__(self) -> None:
+        execute_bytes = () if self.shell else tuple(map(os.fsencode, self.execute))
+        object.__setattr__(self, "execute_bytes", execute_bytes)
+
+    @classmethod
+    def from_config(cls, command: CommandConfig) -> Self:
+        """Make a command from its config entry."""
+        execute = command["execute"]
+        return cls(
+            execute=(execute,) if isinstance(execute, str) else tuple(execute),
+            shell=command.get("shell", False),
+            response=command.get("response", ""),
+        )
+
+
 class Commander:
     """Command runner."""
 
     _commands: dict[str, Command]
+    _children: set[int]
+
+    def __init__(self, commands: dict[str, CommandConfig]) -> None:
+        self._children = set()
+        loaded: dict[str, Command] = {}
+        for name, command in commands.items():
+            if "execute" not in command:
+                print(
+                    f"Loaded command '{name}' is missing 'execute' field.",
+                )
+                logger.error("Loaded command '%s' is missing 'execute' field.", name)
+                continue
+            loaded[name] = Command.from_config(command)
+        self._commands = loaded
+
+    def _launch(self, command: Command) -> None:
+        """Launch a command's process."""
+        if command.shell or not _HAS_POSIX_SPAWN:
+            subprocess.Popen(command.execute, shell=command.shell)
+        else:
+            self._spawn(command)
 
-    def __init__(self, commands: dict[str, Command]) -> None:
-        self._commands = commands
+    def _spawn(self, command: Command) -> int:
+        """Spawn a process without creating a `subprocess.Popen` object."""
+        self._reap_children()
+        execute = command.execute_bytes
+        try:
+            pid = os.posix_spawnp(
+                execute[0], execute, os.environ, setsigdef=_SPAWN_SIGDEF
+            )
+        except OSError as err:
+            # Report the str path like `subprocess.Popen` does, not the bytes.
+            raise OSError(err.errno, err.strerror, command.execute[0]) from None
+        self._children.add(pid)
+        return pid
+
+    def _reap_children(self) -> None:
+        """Reap finished spawned processes so they don't linger as zombies."""
+        for pid in tuple(self._children):
+            try:
+                done_pid, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done_pid = pid
+            if done_pid:
+                self._children.discard(pid)
 
     def run_command_noblock(self, name: str) -> str | None:
         """Run a command if it exists."""
+        # A generated `if` chain over the names only ties this when the first
+        # branch hits; later hits and misses are slower with every command.
         command = self._commands.get(name)
         if command is None:
             return None
 
         try:
-            execute = command["execute"]
-            shell = command.get("shell", False)
-
-            subprocess.Popen(execute, shell=shell)
-
-        except KeyError:
-            print(
-                f"Loaded command '{name}' is missing 'execute' field.",
-            )
-            logger.error("Loaded command '%s' is missing 'execute' field.", name)
-            return None
-
+            self._launch(command)
         except Exception as err:
             return f"Failed to execute command '{name}': {err}"
 
-        else:
-            return command.get("response", "")
+        return command.response
+
+
+class LaunchWorker:
+    """Batch command launches submitted from the event loop.
+
+    Pending launches are drained from a queue, up to `batch_size` at once,
+    and run together in one executor job. Batches are not awaited one by one,
+    so up to the executor's worker count run at the same time.
+    """
+
+    __slots__ = ("_commander", "_executor", "_batch_size", "_queue", "_task")
+
+    _commander: Commander
+    _executor: Executor | None
+    _batch_size: int
+    _queue: asyncio.Queue[tuple[str, asyncio.Future[str | None]]]
+    _task: asyncio.Task[None] | None
+
+    def __init__(
+        self,
+        commander: Commander,
+        executor: Executor | None = None,
+        batch_size: int = 16,
+    ) -> None:
+        self._commander = commander
+        self._executor = executor
+        self._batch_size = batch_size
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    async def run_command(self, name: str) -> str | None:
+        """Run a command if it exists, see `Commander.run_command_noblock`."""
+        loop = asyncio.get_running_loop()
+        # Started lazily, the event loop only runs once the client is running.
+        task = self._task
+        if task is None or task.done():
+            if task is not None and not task.cancelled():
+                logger.error(
+                    "Command launch worker stopped, restarting.",
+                    exc_info=task.exception(),
+                )
+            self._task = loop.create_task(self._work())
+        future: asyncio.Future[str | None] = loop.create_future()
+        self._queue.put_nowait((name, future))
+        return await future
+
+    async def _work(self) -> None:
+        """Drain the queue and launch commands in batches."""
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            items = [await queue.get()]
+            while len(items) < self._batch_size and not queue.empty():
+                items.append(queue.get_nowait())
+
+            try:
+                job = loop.run_in_executor(
+                    self._executor, self._launch_batch, [name for name, _ in items]
+                )
+            except Exception as err:
+                # E.g. the executor has been shut down.
+                self._fail_batch(items, err)
+                continue
+            job.add_done_callback(functools.partial(self._resolve_batch, items))
+
+    async def close(self) -> None:
+        """Stop the worker task and cancel launches still queued."""
+        task = self._task
+        self._task = None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        queue = self._queue
+        while not queue.empty():
+            _, future = queue.get_nowait()
+            future.cancel()
+
+    @staticmethod
+    def _fail_batch(
+        items: list[tuple[str, asyncio.Future[str | None]]], err: BaseException
+    ) -> None:
+        """Fail the futures of a batch that could not be launched."""
+        logger.error("Failed to launch command batch.", exc_info=err)
+        for _, future in items:
+            if not future.done():
+                future.set_exception(err)
+
+    @classmethod
+    def _resolve_batch(
+        cls,
+        items: list[tuple[str, asyncio.Future[str | None]]],
+        job: asyncio.Future[list[str | None]],
+    ) -> None:
+        """Resolve the futures of a finished batch."""
+        if job.cancelled():
+            for _, future in items:
+                future.cancel()
+            return
+
+        err = job.exception()
+        if err is not None:
+            cls._fail_batch(items, err)
+            return
+
+        for (_, future), result in zip(items, job.result()):
+            if not future.done():
+                future.set_result(result)
+
+    def _launch_batch(self, names: list[str]) -> list[str | None]:
+        """Launch a batch of commands."""
+        run_command_noblock = self._commander.run_command_noblock
+        return [run_command_noblock(name) for name in names]
@@ -0,0 +1,182 @@
+# Copyright 2025 IO Club
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Application config."""
+
+import glob
+import logging
+import os
+import pickle
+from types import MappingProxyType
+from typing import Any
+
+try:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError.
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+logger = logging.getLogger(__name__)
+
+_HAS_FADVISE = hasattr(os, "posix_fadvise")
+
+
+class ConfigError(KeyError):
+    """Missing entry in config."""
+
+    _missing: str
+
+    def __init__(self, missing_key: str):
+        self._missing = missing_key
+
+    def __repr__(self) -> str:
+        return f"Missing entry with key {self._missing}"
+
+
+type ConfigDict = dict[str, Any]
+type CacheKey = tuple[int, int, int]
+
+_MISSING = object()
+
+
+class ConfigEntry:
+    """Config entry descriptor.
+
+    The key is captured at class definition, e.g. `appid = ConfigEntry("appid")`.
+    """
+
+    __slots__ = ("key", "required", "default")
+
+    key: str
+    required: bool
+    default: Any
+
+    def __init__(self, key: str, *, required: bool = True, default: Any = None) -> None:
+        self.key = key
+        self.required = required
+        self.default = default
+
+    def __get__(self, obj: Any, objtype: type | None = None) -> Any:
+        if obj is None:
+            return self
+        if not self.required:
+            return obj._conf_dict.get(self.key, self.default)
+        value = obj._conf_dict.get(self.key, _MISSING)
+        if value is _MISSING:
+            raise ConfigError(self.key)
+        return value
+
+
+class Config:
+    """Application config."""
+
+    _conf_dict: dict
+
+    def __init__(self, config_dict: dict) -> None:
+        self._conf_dict = config_dict
+
+    appid = ConfigEntry("appid")
+    """Bot app ID."""
+
+    secret = ConfigEntry("secret")
+    """Bot app secret."""
+
+    commands = ConfigEntry("commands", required=False, default=MappingProxyType({}))
+    """Commands."""
+
+    @classmethod
+    def load_json(cls, path: str) -> "Config":
+        """Load config from json file.
+
+        The parsed config is cached next to the file in a pickle keyed by
+        the file's mtime, size and inode, so warm starts skip JSON parsing.
+        """
+        st = os.stat(path)
+        cache_key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        cache_path = f"{path}.{st.st_mtime_ns}.pkl"
+        conf_dict = cls._read_cache(cache_path, cache_key)
+        if conf_dict is not None:
+            return cls(conf_dict)
+
+        fd = os.open(path, os.O_RDONLY)
+        if _HAS_FADVISE:
+            try:
+                # Read once from start to end, let the kernel read ahead.
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            except OSError:
+                pass
+        with os.fdopen(fd, "rb") as f:
+            conf_dict = _json_loads(f.read())
+        cls._write_cache(path, cache_path, cache_key, conf_dict)
+        return cls(conf_dict)
+
+    @staticmethod
+    def _read_cache(cache_path: str, cache_key: CacheKey) -> ConfigDict | None:
+        """Read parsed config cache, `None` if missing, stale or untrusted."""
+        try:
+            with open(cache_path, "rb") as f:
+                # Unpickling runs code, only trust a cache nobody else could write.
+                st = os.fstat(f.fileno())
+                if hasattr(os, "getuid") and (
+                    st.st_uid != os.getuid() or st.st_mode & 0o022
+                ):
+                    logger.warning("Ignoring untrusted config cache %s", cache_path)
+                    return None
+                cached_key, conf_dict = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as err:
+            # A broken cache must never keep the app from starting.
+            logger.warning("Ignoring unreadable config cache %s: %s", cache_path, err)
+            return None
+        if cached_key != cache_key or not isinstance(conf_dict, dict):
+            return None
+        return conf_dict
+
+    @staticmethod
+    def _write_cache(
+        path: str, cache_path: str, cache_key: CacheKey, conf_dict: ConfigDict
+    ) -> None:
+        """Write parsed config cache and drop stale ones."""
+        for stale_path in glob.glob(f"{glob.escape(path)}.*.pkl"):
+            if stale_path != cache_path:
+                try:
+                    os.remove(stale_path)
+                except OSError:
+                    pass
+
+        tmp_path = f"{cache_path}.tmp"
+        try:
+            # The config holds the app secret, keep the cache private.
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(
+                    (cache_key, conf_dict), f, protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_path, cache_path)
+        except Exception as err:
+            logger.warning("Failed to write config cache %s: %s", cache_path, err)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def require_config_entry(config_dict: ConfigDict, key: str) -> Any:
+        """Get config entry by key."""
+        value = config_dict.get(key, _MISSING)
+        if value is _MISSING:
+            raise ConfigError(key)
+        return value